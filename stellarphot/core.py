@@ -1,9 +1,16 @@
 import re
+from copy import deepcopy
+from collections.abc import Mapping
 
 from astropy import units as u
-from astropy.coordinates import EarthLocation, SkyCoord
-from astropy.table import Column, QTable, Table
-from astropy.time import Time
+from astropy.coordinates import (
+    CartesianRepresentation,
+    EarthLocation,
+    SkyCoord,
+    UnitSphericalRepresentation,
+)
+from astropy.table import Column, MaskedColumn, QTable, Table
+from astropy.time import Time, TimeDelta
 from astropy.units import Quantity, Unit
 from astropy.wcs import WCS
 
@@ -25,6 +32,12 @@ __all__ = [
 ]
 
 
+# PhotometryData columns that must all have the same counts unit
+_COUNTS_COLUMNS = ("aperture_sum", "annulus_sum", "aperture_net_cnts", "noise_cnts")
+# PhotometryData columns that must have that counts unit per pixel
+_COUNTS_PER_PIXEL_COLUMNS = ("sky_per_pix_avg", "sky_per_pix_med", "sky_per_pix_std")
+
+
 # Approach to validation of units was inspired by the GammaPy project
 # which did it before we did:
 # https://docs.gammapy.org/dev/_modules/gammapy/analysis/config.html
@@ -345,14 +358,14 @@ class BaseEnhancedTable(QTable):
             super().__init__(*args, **kwargs)
         else:
             # Confirm a proper table description is passed (that is dict-like with keys
-            # and values)
-            try:
-                self._table_description = {k: v for k, v in table_description.items()}
-            except AttributeError:
+            # and values). The descriptions are never modified, so there is no need
+            # to make a copy.
+            if not isinstance(table_description, Mapping):
                 raise TypeError(
                     "You must provide a dict as table_description (input "
-                    f"table_description is type {type(self._table_description)})."
+                    f"table_description is type {type(table_description)})."
                 )
+            self._table_description = table_description
 
             # Check data before copying to avoid recusive loop and non-QTable
             # data input.
@@ -365,8 +378,12 @@ class BaseEnhancedTable(QTable):
                     f"type {type(input_data)})."
                 )
 
-            # Copy data before potential modification
-            data = input_data.copy()
+            # Copy data before potential modification. Only the table structure
+            # is copied here, which is enough for renaming columns; selecting the
+            # columns in order below makes the copy of the data itself. The
+            # structural copy shares meta with the input, so copy that too.
+            data = input_data.copy(copy_data=False)
+            data.meta = deepcopy(input_data.meta)
 
             # Rename columns before validation (if needed)
             if colname_map is not None:
@@ -393,7 +410,9 @@ class BaseEnhancedTable(QTable):
                     order_col_list.append(col)
             data = data[order_col_list]
 
-            # Call QTable initializer to finish up
+            # Call QTable initializer to finish up. data is already a private
+            # copy of input_data, so there is no need for QTable to copy it again.
+            kwargs.setdefault("copy", False)
             super().__init__(data=data, **kwargs)
 
     def _validate_columns(self, data):
@@ -406,16 +425,17 @@ class BaseEnhancedTable(QTable):
             if this_unit is not None:
                 # Check type
                 try:
-                    if data[this_col].unit != this_unit:
-                        raise ValueError(
-                            f"data['{this_col}'] is of wrong unit "
-                            f"(should be {this_unit} but reported "
-                            f"as {data[this_col].unit})."
-                        )
+                    col_unit = data[this_col].unit
                 except KeyError:
                     raise ValueError(
                         f"data['{this_col}'] is missing from input " "data."
                     )
+                if col_unit is not this_unit and col_unit != this_unit:
+                    raise ValueError(
+                        f"data['{this_col}'] is of wrong unit "
+                        f"(should be {this_unit} but reported "
+                        f"as {col_unit})."
+                    )
             else:  # Check that columns with no units but are required exist!
                 try:
                     _ = data[this_col]
@@ -439,9 +459,34 @@ class BaseEnhancedTable(QTable):
     def _update_passbands(self):
         # Converts filter names in filter column to AAVSO standard names
         # Assumes _passband_map is in namespace.
-        for orig_pb, aavso_pb in self._passband_map.items():
-            mask = self["passband"] == orig_pb
-            self["passband"][mask] = aavso_pb
+        # Each distinct passband is looked up in the map once and the column
+        # is then replaced in a single assignment. Replacing the column, rather
+        # than writing into it, also avoids truncating new names that are
+        # longer than the original ones.
+        if not self._passband_map:
+            return
+
+        passband_col = self["passband"]
+        passbands, inverse = np.unique(np.asarray(passband_col), return_inverse=True)
+
+        # Nothing to do if none of the passbands in the table are in the map
+        if not any(pb in self._passband_map for pb in passbands):
+            return
+
+        new_passbands = np.array([self._passband_map.get(pb, pb) for pb in passbands])
+
+        # Build the replacement as the same kind of column with the same info.
+        # np.asarray drops the mask of a masked column, so put it back.
+        col_kwargs = dict(
+            name=passband_col.info.name,
+            description=passband_col.info.description,
+            unit=passband_col.info.unit,
+            format=passband_col.info.format,
+            meta=deepcopy(passband_col.info.meta),
+        )
+        if isinstance(passband_col, MaskedColumn):
+            col_kwargs["mask"] = passband_col.mask
+        self["passband"] = passband_col.__class__(new_passbands[inverse], **col_kwargs)
 
     def clean(self, remove_rows_with_mask=False, **other_restrictions):
         """
@@ -523,6 +568,37 @@ class BaseEnhancedTable(QTable):
         return self[keepers]
 
 
+def _barycentric_light_travel_time(times, coords, location):
+    """
+    Barycentric light travel time correction for each pair of time and
+    coordinate, equivalent to ``times.light_travel_time(coords, location=location)``.
+
+    Nearly all of the cost of the astropy calculation is finding the barycentric
+    position of the observatory, which depends only on the time, and typically
+    many rows share a time (e.g. all of the stars in one image). The correction
+    is the dot product of that position with the unit vector to the source, so
+    the corrections along the three coordinate axes are computed once for each
+    distinct time and then combined with the direction to each source.
+    """
+    _, first, inverse = np.unique(
+        np.column_stack([times.jd1, times.jd2]),
+        axis=0,
+        return_index=True,
+        return_inverse=True,
+    )
+    axes = SkyCoord(
+        CartesianRepresentation(np.identity(3) * u.one, copy=False), frame="icrs"
+    )
+    axis_ltt = (
+        times[first].reshape(-1, 1).light_travel_time(axes, location=location)
+    ).to_value(u.s)
+    unit_vectors = (
+        coords.icrs.represent_as(UnitSphericalRepresentation).to_cartesian().xyz.value
+    )
+    ltt = (axis_ltt[inverse.reshape(-1)] * unit_vectors.T).sum(axis=-1)
+    return TimeDelta(ltt, format="sec")
+
+
 class PhotometryData(BaseEnhancedTable):
     """
     A modified `astropy.table.QTable` to hold reduced photometry data that
@@ -687,20 +763,23 @@ class PhotometryData(BaseEnhancedTable):
                     f"of type {type(camera)}."
                 )
 
-            # Check the time column is correct format and scale
-            try:
-                if input_data["date-obs"][0].scale != "utc":
-                    raise ValueError(
-                        "input_data['date-obs'] astropy.time.Time must "
-                        "have scale='utc', "
-                        f"not '{input_data['date-obs'][0].scale}'."
-                    )
-            except AttributeError:
-                # Happens if first item dosn't have a "scale"
+            # Check the time column is correct format and scale. It may either be
+            # a Time column or a column of Time entries.
+            date_obs = input_data["date-obs"]
+            if isinstance(date_obs, Time):
+                time_scale = date_obs.scale
+            elif len(date_obs) > 0 and isinstance(date_obs[0], Time):
+                time_scale = date_obs[0].scale
+            else:
                 raise ValueError(
                     "input_data['date-obs'] isn't column of "
                     "astropy.time.Time entries."
                 )
+            if time_scale != "utc":
+                raise ValueError(
+                    "input_data['date-obs'] astropy.time.Time must "
+                    f"have scale='utc', not '{time_scale}'."
+                )
 
             # Convert input data to QTable (while also checking for required columns)
             super().__init__(
@@ -725,46 +804,45 @@ class PhotometryData(BaseEnhancedTable):
             self.meta["max_data_value"] = camera.max_data_value
 
             # Check for consistency of counts-related columns
-            counts_columns = [
-                "aperture_sum",
-                "annulus_sum",
-                "aperture_net_cnts",
-                "noise_cnts",
-            ]
-            counts_per_pixel_columns = [
-                "sky_per_pix_avg",
-                "sky_per_pix_med",
-                "sky_per_pix_std",
-            ]
-            cnts_unit = self[counts_columns[0]].unit
-            for this_col in counts_columns[1:]:
-                if input_data[this_col].unit != cnts_unit:
+            # Fetch each column only once and compare units by identity first,
+            # since matching units are usually the same object.
+            cnts_unit = self[_COUNTS_COLUMNS[0]].unit
+            for this_col in _COUNTS_COLUMNS[1:]:
+                col_unit = self[this_col].unit
+                if col_unit is not cnts_unit and col_unit != cnts_unit:
                     raise ValueError(
                         f"input_data['{this_col}'] has inconsistent units "
-                        f"with input_data['{counts_columns[0]}'] (should "
+                        f"with input_data['{_COUNTS_COLUMNS[0]}'] (should "
                         f"be {cnts_unit} but it's "
-                        f"{input_data[this_col].unit})."
+                        f"{col_unit})."
                     )
-            for this_col in counts_per_pixel_columns:
-                if cnts_unit is None:
-                    perpixel = u.pixel**-1
-                else:
-                    perpixel = cnts_unit * u.pixel**-1
-                if input_data[this_col].unit != perpixel:
+            if cnts_unit is None:
+                perpixel = u.pixel**-1
+            else:
+                perpixel = cnts_unit * u.pixel**-1
+            for this_col in _COUNTS_PER_PIXEL_COLUMNS:
+                col_unit = self[this_col].unit
+                if col_unit != perpixel:
                     raise ValueError(
                         f"input_data['{this_col}'] has inconsistent units "
-                        f"with input_data['{counts_columns[0]}'] (should "
+                        f"with input_data['{_COUNTS_COLUMNS[0]}'] (should "
                         f"be {perpixel} but it's "
-                        f"{input_data[this_col].unit})."
+                        f"{col_unit})."
                     )
 
-            # Compute additional columns (not done yet)
-            computed_columns = ["bjd", "night"]
+            # Compute additional columns. Build the observation times once so
+            # that the computed columns do not each rebuild them from 'date-obs'.
+            times = self._observation_times()
 
             # Check if columns exist already, if they do and retain_user_computed is
-            # False,  throw an error.
-            for this_col in computed_columns:
-                if this_col in self.colnames:
+            # False,  throw an error. Otherwise compute them.
+            existing_columns = set(self.colnames)
+            computed_columns = (
+                ("bjd", self._bjd_col),
+                ("night", self._night_col),
+            )
+            for this_col, compute_col in computed_columns:
+                if this_col in existing_columns:
                     if not retain_user_computed:
                         raise ValueError(
                             f"Computed column '{this_col}' already exist "
@@ -772,58 +850,60 @@ class PhotometryData(BaseEnhancedTable):
                             "retain_user_computed=True."
                         )
                 else:
-                    # Compute the columns that need to be computed (match requries
-                    # python>=3.10)
-                    match this_col:
-                        case "bjd":
-                            self["bjd"] = self.add_bjd_col(observatory)
-
-                        case "night":
-                            # Generate integer counter for nights. This should be
-                            # approximately the MJD at noon local before the evening of
-                            # the observation.
-                            hr_offset = int(observatory.lon.value / 15)
-                            # Compute offset to 12pm Local Time before evening
-                            LocalTime = Time(self["date-obs"]) + hr_offset * u.hr
-                            hr = LocalTime.ymdhms.hour
-                            # Compute number of hours to shift to arrive at 12 noon
-                            # local time
-                            shift_hr = hr.copy()
-                            shift_hr[hr < 12] = shift_hr[hr < 12] + 12
-                            shift_hr[hr >= 12] = shift_hr[hr >= 12] - 12
-                            delta = (
-                                -shift_hr * u.hr
-                                - LocalTime.ymdhms.minute * u.min
-                                - LocalTime.ymdhms.second * u.s
-                            )
-                            shift = Column(data=delta, name="shift")
-                            # Compute MJD at local noon before the evening of this
-                            # observation.
-                            self["night"] = Column(
-                                data=np.array(
-                                    (Time(self["date-obs"]) + shift).to_value("mjd"),
-                                    dtype=int,
-                                ),
-                                name="night",
-                            )
-
-                        case _:
-                            raise ValueError(
-                                f"Trying to compute column ({this_col}). "
-                                "This should never happen."
-                            )
+                    self[this_col] = compute_col(observatory, times)
 
             # Apply the filter/passband name update
+            # The map is only read, so keep a reference rather than a copy.
+            self._passband_map = passband_map
             if passband_map is not None:
-                self._passband_map = passband_map.copy()
                 self._update_passbands()
 
+    def _observation_times(self):
+        # Return the observation times as a single Time object, avoiding a
+        # re-parse when 'date-obs' is already a Time column.
+        date_obs = self["date-obs"]
+        if isinstance(date_obs, Time):
+            return date_obs
+        return Time(date_obs, copy=False)
+
+    def _night_col(self, observatory, times):
+        # Generate integer counter for nights. This should be approximately the
+        # MJD at noon local before the evening of the observation.
+
+        # Approximate offset in whole hours from UTC to local time. to_value
+        # makes the conversion to degrees explicit rather than assuming the
+        # longitude is stored in degrees.
+        hr_offset = int(observatory.lon.to_value(u.deg) / 15)
+
+        # Compute offset to 12pm Local Time before evening
+        offset_sec = hr_offset * 3600.0
+        local_time = times + TimeDelta(offset_sec, format="sec")
+        local_ymdhms = local_time.ymdhms
+        hr = local_ymdhms.hour
+        # Compute number of hours to shift to arrive at 12 noon local time
+        shift_hr = np.where(hr < 12, hr + 12, hr - 12)
+        # The shift also undoes the offset to local time so that the result is
+        # the UTC time of that local noon.
+        delta_sec = -(
+            shift_hr * 3600.0
+            + local_ymdhms.minute * 60
+            + local_ymdhms.second
+            + offset_sec
+        )
+
+        # Compute MJD at local noon before the evening of this observation.
+        shifted = local_time + TimeDelta(delta_sec, format="sec")
+        return np.floor(shifted.mjd).astype(np.int64, copy=False)
+
     def add_bjd_col(self, observatory):
         """
         Returns a astropy column of barycentric Julian date times corresponding to
         the input observations.  It modifies that table in place.
         """
+        return self._bjd_col(observatory, self._observation_times())
 
+    def _bjd_col(self, observatory, times):
+        # Compute the BJD column from the observation times of the rows.
         if np.isnan(self["ra"]).any() or np.isnan(self["dec"]).any():
             print(
                 "WARNING: BJD could not be computed in output PhotometryData object "
@@ -833,13 +913,13 @@ class PhotometryData(BaseEnhancedTable):
         else:
             # Convert times at start of each observation to TDB (Barycentric Dynamical
             # Time)
-            times = Time(self["date-obs"])
             times_tdb = times.tdb
             times_tdb.format = "jd"  # Switch to JD format
 
-            # Compute light travel time corrections
-            ip_peg = SkyCoord(ra=self["ra"], dec=self["dec"], unit="degree")
-            ltt_bary = times.light_travel_time(ip_peg, location=observatory)
+            # Compute light travel time corrections; ra and dec already carry
+            # their units, so no unit parsing is needed here.
+            ip_peg = SkyCoord(self["ra"], self["dec"], frame="icrs")
+            ltt_bary = _barycentric_light_travel_time(times, ip_peg, observatory)
             time_barycenter = times_tdb + ltt_bary
 
             # Return BJD at midpoint of exposure at each location
@@ -967,7 +1047,6 @@ class CatalogData(BaseEnhancedTable):
 
                 # Apply the filter/passband name update
                 if passband_map is not None:
-                    self._passband_map = passband_map.copy()
                     self._update_passbands()
 
             else:
@@ -1392,8 +1471,12 @@ class SourceListData(BaseEnhancedTable):
                     "BaseEnhancedTable) as data."
                 )
 
-            # Process inputs and save as needed
-            data = input_data.copy()
+            # Process inputs and save as needed. Renaming and adding columns does
+            # not change the data in the input table, so there is no need to copy
+            # the data; BaseEnhancedTable makes the copy. meta is shared by the
+            # structural copy, though, so copy it here.
+            data = input_data.copy(copy_data=False)
+            data.meta = deepcopy(input_data.meta)
 
             # Rename columns before checking for ra/dec or xcenter/ycenter
             # columns being missing.
@@ -1,5 +1,7 @@
+from concurrent.futures import ThreadPoolExecutor
 import functools
 from pathlib import Path
+import time
 
 import ipywidgets as ipw
 
@@ -9,6 +11,7 @@ from astropy.table import Table
 from astropy.coordinates import SkyCoord
 from astropy import units as u
 from astropy.coordinates.name_resolve import NameResolveError
+from scipy.spatial import cKDTree
 
 
 try:
@@ -17,8 +20,6 @@ except ImportError:
     from astrowidgets.ginga import ImageWidget
 
 from stellarphot import SourceListData
-from stellarphot.differential_photometry import *
-from stellarphot.photometry import *
 from stellarphot.gui_tools.seeing_profile_functions import set_keybindings
 from stellarphot.gui_tools.fits_opener import FitsOpener
 from stellarphot.io import TessSubmission, TOI, TessTargetFile
@@ -34,6 +35,102 @@ __all__ = ["make_markers", "wrap", "ComparisonViewer"]
 
 DESC_STYLE = {"description_width": "initial"}
 
+# Chord lengths on the unit sphere for the click gate and duplicate radius
+_CLICK_CHORD = 2 * np.sin((5 * u.arcsec).to_value(u.rad))
+_DUPLICATE_CHORD = 2 * np.sin((0.5 * u.arcsec).to_value(u.rad))
+
+
+# Order in which each kind of marker is numbered in the aperture file
+_SORT_ORDER = {"TESS Targets": 0, "VSX": 1, "APASS comparison": 2}
+
+# Marker styles for each set of stars shown by make_markers; the elim marker
+# is left selected for the stars excluded by clicking.
+_TESS_MARKER = {"type": "circle", "color": "green", "radius": 10}
+_VSX_MARKER = {"type": "circle", "color": "blue", "radius": 10}
+_APASS_MARKER = {"type": "circle", "color": "red", "radius": 10}
+_ELIM_MARKER = {"type": "cross", "color": "red", "radius": 6}
+
+# Label prefix and color for each kind of marker
+_LABEL_STYLES = {
+    "TESS Targets": ("T", "green"),
+    "APASS comparison": ("C", "red"),
+    "VSX": ("V", "blue"),
+}
+
+# Name resolution is a network round trip, so it is done off the GUI thread
+_NAME_RESOLVER = ThreadPoolExecutor(max_workers=1)
+
+
+@functools.lru_cache(maxsize=256)
+def _resolve_name(name):
+    """
+    Cached wrapper around `astropy.coordinates.SkyCoord.from_name`.
+    """
+    return SkyCoord.from_name(name)
+
+
+def _unit_vectors(lon, lat):
+    """
+    Cartesian unit vectors for longitudes and latitudes in radians.
+    """
+    cos_lat = np.cos(lat)
+    return np.stack(
+        [cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)], axis=-1
+    )
+
+
+def _coord_tree(coords):
+    """
+    KD-tree of the unit vectors of ``coords``, which are kept in its ``data``.
+    """
+    spherical = coords.spherical
+    return cKDTree(_unit_vectors(spherical.lon.rad, spherical.lat.rad))
+
+
+def _haversine(lon1, lat1, lon2, lat2):
+    """
+    Angular separation, in radians, between points given in radians.
+    """
+    sin_dlat = np.sin((lat1 - lat2) / 2)
+    sin_dlon = np.sin((lon1 - lon2) / 2)
+    return 2 * np.arcsin(
+        np.sqrt(sin_dlat**2 + np.cos(lat1) * np.cos(lat2) * sin_dlon**2)
+    )
+
+
+def _all_markers(imagewidget):
+    """
+    Table of all of the markers on the widget.
+
+    Building the table walks every marker on the canvas, so it is cached on
+    the widget until a new image is loaded or a set of markers is added or
+    removed. astrowidgets replaces the canvas object for a marker set
+    whenever it changes, so the objects on the canvas identify the
+    snapshot. The table is shared; do not modify it.
+    """
+    key = (imagewidget._viewer.get_image(), *imagewidget._viewer.canvas.objects)
+    cached_key, all_table = getattr(imagewidget, "_marker_snapshot", ((), None))
+    if len(key) != len(cached_key) or any(
+        new is not old for new, old in zip(key, cached_key)
+    ):
+        try:
+            all_table = imagewidget.get_markers(marker_name="all")
+        except AttributeError:
+            all_table = imagewidget.get_all_markers()
+        imagewidget._marker_snapshot = (key, all_table)
+    return all_table
+
+
+def _marker_tree(imagewidget, all_table):
+    """
+    Return a KD-tree of the marker positions in ``all_table``, rebuilding it
+    only when it is a different snapshot of the markers than last time.
+    """
+    if getattr(imagewidget, "_marker_tree_table", None) is not all_table:
+        imagewidget._marker_kdt = _coord_tree(all_table["coord"])
+        imagewidget._marker_tree_table = all_table
+    return imagewidget._marker_kdt
+
 
 def make_markers(iw, ccd, RD, vsx, ent, name_or_coord=None):
     """
@@ -67,39 +164,93 @@ def make_markers(iw, ccd, RD, vsx, ent, name_or_coord=None):
     None
         Markers are added to the image in Ginga widget.
     """
-    iw.load_nddata(ccd)
-    iw.zoom_level = "fit"
+    # Hold off redrawing the canvas until all of the markers are in place
+    with iw._viewer.suppress_redraw:
+        iw.load_nddata(ccd)
+        iw.zoom_level = "fit"
 
-    try:
-        iw.reset_markers()
-    except AttributeError:
-        iw.remove_all_markers()
+        try:
+            iw.reset_markers()
+        except AttributeError:
+            iw.remove_all_markers()
+        _elim_sources(iw).clear()
+
+        if RD:
+            iw.marker = _TESS_MARKER
+            iw.add_markers(
+                RD,
+                skycoord_colname="coords",
+                use_skycoord=True,
+                marker_name="TESS Targets",
+            )
 
-    if RD:
-        iw.marker = {"type": "circle", "color": "green", "radius": 10}
+        if name_or_coord is not None:
+            if isinstance(name_or_coord, str):
+                iw.center_on(_resolve_name(name_or_coord))
+            else:
+                iw.center_on(name_or_coord)
+
+        if vsx:
+            iw.marker = _VSX_MARKER
+            iw.add_markers(
+                vsx, skycoord_colname="coords", use_skycoord=True, marker_name="VSX"
+            )
+        iw.marker = _APASS_MARKER
         iw.add_markers(
-            RD, skycoord_colname="coords", use_skycoord=True, marker_name="TESS Targets"
+            ent,
+            skycoord_colname="coords",
+            use_skycoord=True,
+            marker_name="APASS comparison",
         )
+        iw.marker = _ELIM_MARKER
 
-    if name_or_coord is not None:
-        if isinstance(name_or_coord, str):
-            iw.center_on(SkyCoord.from_name(name_or_coord))
-        else:
-            iw.center_on(name_or_coord)
 
-    if vsx:
-        iw.marker = {"type": "circle", "color": "blue", "radius": 10}
-        iw.add_markers(
-            vsx, skycoord_colname="coords", use_skycoord=True, marker_name="VSX"
-        )
-    iw.marker = {"type": "circle", "color": "red", "radius": 10}
-    iw.add_markers(
-        ent,
-        skycoord_colname="coords",
-        use_skycoord=True,
-        marker_name="APASS comparison",
-    )
-    iw.marker = {"type": "cross", "color": "red", "radius": 6}
+def _elim_sources(imagewidget):
+    """
+    Mapping from each elim marker name to the keys of the markers it excludes.
+    """
+    try:
+        return imagewidget._elim_sources
+    except AttributeError:
+        imagewidget._elim_sources = {}
+        return imagewidget._elim_sources
+
+
+def _marker_keys(marker_table):
+    """
+    Identify markers by name and pixel position, which the widget returns
+    unchanged for as long as the marker exists.
+    """
+    return zip(marker_table["marker name"], marker_table["x"], marker_table["y"])
+
+
+def _ignore_repeats(wait):
+    """
+    Decorator for a Ginga cursor callback that drops a click arriving
+    within ``wait`` seconds of the previous one at the same pixel.
+
+    The first click is always handled right away; only the repeats that
+    follow it (e.g. a bouncing mouse button or a double click) are dropped,
+    so a quick run of clicks on different stars is still processed.
+    """
+
+    def decorator(func):
+        last = {"time": -np.inf, "pixel": None}
+
+        @functools.wraps(func)
+        def wrapper(viewer, event, data_x, data_y):
+            now = time.monotonic()
+            pixel = (int(np.floor(data_x)), int(np.floor(data_y)))
+            repeat = pixel == last["pixel"] and now - last["time"] < wait
+            last["time"] = now
+            last["pixel"] = pixel
+            if repeat:
+                return
+            return func(viewer, event, data_x, data_y)
+
+        return wrapper
+
+    return decorator
 
 
 def wrap(imagewidget, outputwidget):
@@ -131,42 +282,41 @@ def wrap(imagewidget, outputwidget):
         x = int(np.floor(event.data_x))
         y = int(np.floor(event.data_y))
         ra, dec = i.wcs.wcs.all_pix2world(event.data_x, event.data_y, 0)
-        out_skycoord = SkyCoord(ra=ra, dec=dec, unit=(u.degree, u.degree))
+        click_xyz = _unit_vectors(np.deg2rad(ra), np.deg2rad(dec))
 
-        try:
-            all_table = imagewidget.get_markers(marker_name="all")
-        except AttributeError:
-            all_table = imagewidget.get_all_markers()
+        all_table = _all_markers(imagewidget)
 
         with outputwidget:
-            index, d2d, d3d = out_skycoord.match_to_catalog_sky(all_table["coord"])
-            if d2d < 10 * u.arcsec:
-                mouse = all_table["coord"][index].separation(all_table["coord"])
-                rat = mouse < 1 * u.arcsec
-                elims = [
-                    name
-                    for name in all_table["marker name"][rat]
-                    if name.startswith("elim")
-                ]
-                if not elims:
-                    imagewidget.add_markers(
-                        all_table[rat],
-                        skycoord_colname="coord",
-                        use_skycoord=True,
-                        marker_name=f"elim{imagewidget.next_elim}",
-                    )
+            kdt = _marker_tree(imagewidget, all_table)
+            _, index = kdt.query(click_xyz, distance_upper_bound=_CLICK_CHORD)
+            if index < kdt.n:
+                rat = np.zeros(len(all_table), dtype=bool)
+                rat[kdt.query_ball_point(kdt.data[index], r=_DUPLICATE_CHORD)] = True
+                names = np.asarray(all_table["marker name"][rat], dtype=str)
+                # An elim covering several markers shows up once per marker
+                elims = np.unique(names[np.char.startswith(names, "elim")])
+                if not len(elims):
+                    elim_name = f"elim{imagewidget.next_elim}"
+                    # The marker table already has pixel positions, so there
+                    # is no need to project the sky coordinates again.
+                    imagewidget.add_markers(all_table[rat], marker_name=elim_name)
+                    # Remember which markers this elim excludes so that
+                    # generate_table does not have to match them up again.
+                    sources = _elim_sources(imagewidget)
+                    sources[elim_name] = set(_marker_keys(all_table[rat]))
                 else:
                     for elim in elims:
                         try:
                             imagewidget.remove_markers_by_name(marker_name=elim)
                         except AttributeError:
                             imagewidget.remove_markers(marker_name=elim)
+                        _elim_sources(imagewidget).pop(elim, None)
 
             else:
                 print("sorry try again")
                 imagewidget._viewer.onscreen_message("Click closer to a star")
 
-    return cb
+    return _ignore_repeats(0.05)(cb)
 
 
 class ComparisonViewer:
@@ -262,6 +412,8 @@ class ComparisonViewer:
         self.targets_from_file = targets_from_file
         self.tess_submission = None
         self._tess_object_info = None
+        self._vsx_kdt = None
+        self._label_cache = (None, None, None, None)
         self.target_coord = object_coordinate
 
         self.box, self.iw = self._viewer()
@@ -286,6 +438,15 @@ class ComparisonViewer:
             self._file_chooser.path.name,
             directory_with_images=self._file_chooser.path.parent,
         )
+        # Used to match VSX markers back to the variables they came from
+        self._vsx_kdt = _coord_tree(self.vsx["coords"]) if self.vsx else None
+
+        # Width of the image on the sky, used when zooming in on the target
+        left_side = self.ccd.wcs.pixel_to_world(0, self.ccd.shape[1] / 2)
+        right_side = self.ccd.wcs.pixel_to_world(
+            self.ccd.shape[0], self.ccd.shape[1] / 2
+        )
+        self._fov = left_side.separation(right_side)
 
         apass, vsx_apass_angle, targets_apass_angle = crossmatch_APASS2VSX(
             self.ccd, self.targets_from_file, self.vsx
@@ -317,8 +478,11 @@ class ComparisonViewer:
         """
         comp_table = self.generate_table()
         new_vsx_mark = comp_table["marker name"] == "VSX"
-        idx, _, _ = comp_table["coord"][new_vsx_mark].match_to_catalog_sky(
-            self.vsx["coords"]
+        _, idx = self._vsx_kdt.query(
+            _unit_vectors(
+                np.deg2rad(comp_table["ra"][new_vsx_mark]),
+                np.deg2rad(comp_table["dec"][new_vsx_mark]),
+            )
         )
         our_vsx = self.vsx[idx]
         our_vsx["star_id"] = comp_table["star_id"][new_vsx_mark]
@@ -334,11 +498,9 @@ class ComparisonViewer:
             # No object, will show empty box for name
             self.object_name.disabled = False
 
-        # We have a name, try to get coordinates from it
-        try:
-            self.target_coord = SkyCoord.from_name(self.object_name.value)
-        except NameResolveError:
-            pass
+        # We have a name, start looking up its coordinates while we check
+        # whether this is a TESS object.
+        resolved = _NAME_RESOLVER.submit(_resolve_name, self.object_name.value)
 
         # Maybe this is a tess object?
         try:
@@ -348,6 +510,10 @@ class ComparisonViewer:
         except ValueError:
             # Guess not, time to turn on the coordinates box
             # self._turn_on_coordinates()
+            try:
+                self.target_coord = resolved.result()
+            except NameResolveError:
+                pass
             self.tess_submission = None
             self.toi_info = None
             self.targets_from_file = None
@@ -628,38 +794,51 @@ class ComparisonViewer:
         comp_table : `astropy.table.Table`
             Table of stars to use for the aperture file.
         """
-        try:
-            all_table = self.iw.get_all_markers()
-        except AttributeError:
-            all_table = self.iw.get_markers(marker_name="all")
+        all_table = _all_markers(self.iw)
 
-        elims = np.array([name.startswith("elim") for name in all_table["marker name"]])
+        elims = np.char.startswith(
+            np.asarray(all_table["marker name"], dtype=str), "elim"
+        )
         elim_table = all_table[elims]
         comp_table = all_table[~elims]
 
-        index, d2d, d3d = elim_table["coord"].match_to_catalog_sky(comp_table["coord"])
-        comp_table.remove_rows(index)
+        # Drop the markers excluded by each elim, as recorded when it was made
+        sources = _elim_sources(self.iw)
+        excluded = set().union(
+            *(sources.get(name, ()) for name in set(elim_table["marker name"]))
+        )
+        if excluded:
+            keep = [key not in excluded for key in _marker_keys(comp_table)]
+            comp_table = comp_table[np.array(keep, dtype=bool)]
 
         # Add separate RA and Dec columns for ease in processing later
         comp_table["ra"] = comp_table["coord"].ra.degree
         comp_table["dec"] = comp_table["coord"].dec.degree
 
-        # Calculate how far each is from target
-        comp_table["separation"] = self.target_coord.separation(comp_table["coord"])
-
-        # Add dummy column for sorting in the order we want
-        comp_table["sort"] = np.zeros(len(comp_table))
+        # Calculate how far each is from target, working on plain arrays
+        # rather than going through SkyCoord.separation.
+        target = self.target_coord.transform_to(comp_table["coord"].frame)
+        separation = _haversine(
+            np.deg2rad(comp_table["ra"]),
+            np.deg2rad(comp_table["dec"]),
+            target.ra.rad,
+            target.dec.rad,
+        )
+        comp_table["separation"] = np.rad2deg(separation) * u.deg
 
-        # Set sort order
-        apass_mark = comp_table["marker name"] == "APASS comparison"
-        vsx_mark = comp_table["marker name"] == "VSX"
-        tess_mark = (comp_table["marker name"] == "TESS Targets") | (
-            comp_table["separation"] < 0.3 * u.arcsec
+        # Set sort order by looking up each distinct marker name once;
+        # anything within 0.3 arcsec of the target sorts with the TESS targets.
+        marker_names, name_index = np.unique(
+            comp_table["marker name"], return_inverse=True
+        )
+        name_sort = np.array(
+            [_SORT_ORDER.get(name, 0) for name in marker_names], dtype=float
         )
+        sort = name_sort[name_index]
+        sort[comp_table["separation"] < 0.3 * u.arcsec] = 0
 
-        comp_table["sort"][apass_mark] = 2
-        comp_table["sort"][vsx_mark] = 1
-        comp_table["sort"][tess_mark] = 0
+        # Add column for sorting in the order we want
+        comp_table["sort"] = sort
 
         # Sort the table
         comp_table.sort(["sort", "separation"])
@@ -679,58 +858,64 @@ class ComparisonViewer:
         None
             Labels for the stars are shown.
         """
-        plot_names = []
-        comp_table = self.generate_table()
+        # Labels only depend on the markers and the target, so reuse the last
+        # set computed if neither has changed (e.g. labels hidden then shown).
+        all_table = _all_markers(self.iw)
+        for_table, for_target, label_table, label_styles = self._label_cache
+        if for_table is not all_table or for_target is not self.target_coord:
+            label_table, label_styles = self._make_labels()
+            self._label_cache = (
+                all_table,
+                self.target_coord,
+                label_table,
+                label_styles,
+            )
+
+        # The widget calls the marker once per row, in order, so pull the text
+        # and color for each label from an iterator. That lets all of the
+        # labels be added to the canvas in a single call.
+        styles = iter(label_styles)
+
+        def label_marker(**kwargs):
+            text, color = next(styles)
+            return self.iw.dc.Text(
+                text=text, fontsize=20, fontscale=False, color=color, **kwargs
+            )
 
         original_mark = self.iw._marker
-        for star in comp_table:
-            star_id = star["star_id"]
-            if star["marker name"] == "TESS Targets":
-                label = f"T{star_id}"
-                self.iw._marker = functools.partial(
-                    self.iw.dc.Text,
-                    text=label,
-                    fontsize=20,
-                    fontscale=False,
-                    color="green",
-                )
-                self.iw.add_markers(
-                    Table(data=[[star["x"] + 20], [star["y"] - 20]], names=["x", "y"]),
-                    marker_name=self._label_name,
-                )
+        self.iw._marker = label_marker
+        try:
+            self.iw.add_markers(label_table, marker_name=self._label_name)
+        finally:
+            self.iw._marker = original_mark
 
-            elif star["marker name"] == "APASS comparison":
-                label = f"C{star_id}"
-                self.iw._marker = functools.partial(
-                    self.iw.dc.Text,
-                    text=label,
-                    fontsize=20,
-                    fontscale=False,
-                    color="red",
-                )
-                self.iw.add_markers(
-                    Table(data=[[star["x"] + 20], [star["y"] - 20]], names=["x", "y"]),
-                    marker_name=self._label_name,
-                )
+    def _make_labels(self):
+        """
+        Positions and (text, color) of the label for each star in
+        `generate_table`.
+        """
+        comp_table = self.generate_table()
 
-            elif star["marker name"] == "VSX":
-                label = f"V{star_id}"
-                self.iw._marker = functools.partial(
-                    self.iw.dc.Text,
-                    text=label,
-                    fontsize=20,
-                    fontscale=False,
-                    color="blue",
-                )
-                self.iw.add_markers(
-                    Table(data=[[star["x"] + 20], [star["y"] - 20]], names=["x", "y"]),
-                    marker_name=self._label_name,
-                )
-            else:
-                label = f"U{star_id}"
-                print(f"Unrecognized marker name: {star['marker name']}")
-            plot_names.append(label)
-        self.iw._marker = original_mark
+        label_styles = []
+        has_label = np.zeros(len(comp_table), dtype=bool)
+        for i, (name, star_id) in enumerate(
+            zip(comp_table["marker name"], comp_table["star_id"])
+        ):
+            try:
+                prefix, color = _LABEL_STYLES[name]
+            except KeyError:
+                print(f"Unrecognized marker name: {name}")
+                continue
+            label_styles.append((f"{prefix}{star_id}", color))
+            has_label[i] = True
+
+        label_table = Table(
+            dict(
+                x=comp_table["x"][has_label] + 20,
+                y=comp_table["y"][has_label] - 20,
+            )
+        )
+        return label_table, label_styles
 
     def remove_labels(self):
         """
@@ -837,13 +1022,7 @@ class ComparisonViewer:
         # Turn off labels -- too cluttered
         self.remove_labels()
 
-        left_side = self.ccd.wcs.pixel_to_world(0, self.ccd.shape[1] / 2)
-        right_side = self.ccd.wcs.pixel_to_world(
-            self.ccd.shape[0], self.ccd.shape[1] / 2
-        )
-        fov = left_side.separation(right_side)
-
-        view_ratio = width / fov
+        view_ratio = width / self._fov
         # fit first to get zoom level at full field of view
         self.iw.zoom_level = "fit"
 
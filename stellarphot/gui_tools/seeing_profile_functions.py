@@ -1,3 +1,4 @@
+import functools
 from pathlib import Path
 
 import numpy as np
@@ -7,7 +8,7 @@ import ipywidgets as ipw
 from astropy.io import fits
 from astropy.stats import sigma_clipped_stats
 from astropy.table import Table
-from astropy.nddata import Cutout2D
+from astropy.nddata.utils import overlap_slices
 
 try:
     from astrowidgets import ImageWidget
@@ -15,6 +16,8 @@ except ImportError:
     from astrowidgets.ginga import ImageWidget
 
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from IPython.display import display
 
 from stellarphot.io import TessSubmission
 from stellarphot.gui_tools.fits_opener import FitsOpener
@@ -149,13 +152,17 @@ def find_center(image, center_guess, cutout_size=30, max_iters=10):
         np.abs(np.array([x_cm, y_cm]) - pad).max() > 3 or np.abs(cen - ceno).max() > 0.1
     ):
         # Update x, y positions for subsetting
-        x = int(np.floor(x_cm)) + x - pad
-        y = int(np.floor(y_cm)) + y - pad
+        new_x = int(np.floor(x_cm)) + x - pad
+        new_y = int(np.floor(y_cm)) + y - pad
+        if cnt > 0 and (new_x, new_y) == (x, y):
+            # Same cutout as the last pass, so the centroid would not change
+            break
+        x, y = new_x, new_y
         sub_data = image[y - pad : y + pad, x - pad : x + pad]  # - med
         _, sub_med, _ = sigma_clipped_stats(sub_data)
         # sub_med = 0
-        mask = (sub_data - sub_med) < 0
-        x_cm, y_cm = centroid_com(sub_data - sub_med, mask=mask)
+        net_data = sub_data - sub_med
+        x_cm, y_cm = centroid_com(net_data, mask=net_data < 0)
         ceno = cen
         cen = np.array([x_cm + x - pad, y_cm + y - pad])
         if not np.all(~np.isnan(cen)):
@@ -167,6 +174,27 @@ def find_center(image, center_guess, cutout_size=30, max_iters=10):
     return cen
 
 
+@functools.lru_cache(maxsize=8)
+def _radial_grid(size):
+    """
+    Radial grid for a ``size`` x ``size`` cutout, measured from the middle of
+    the cutout, which is where `radial_profile` centers the profile.
+
+    Returns the exact radius of each pixel, the flattened integer radius of
+    each pixel, and the sum of the exact radii and number of pixels at each
+    integer radius. The arrays are shared between calls so they are read-only.
+    """
+    sub_center = (size - 1) / 2
+    yd, xd = np.ogrid[:size, :size]
+    r_exact = np.sqrt((xd - sub_center) ** 2 + (yd - sub_center) ** 2)
+    r = r_exact.astype(int).ravel()
+    rbin = np.bincount(r, r_exact.ravel())
+    nr = np.bincount(r)
+    for array in (r_exact, r, rbin, nr):
+        array.flags.writeable = False
+    return r_exact, r, rbin, nr
+
+
 # TODO: Why exactly is this separate from the class RadialProfile?
 def radial_profile(data, center, size=30, return_scaled=True):
     """
@@ -195,7 +223,8 @@ def radial_profile(data, center, size=30, return_scaled=True):
     -------
 
     r_exact : numpy array
-        Exact radius of center of each pixels from profile center.
+        Exact radius of center of each pixels from profile center. This
+        array is shared by all profiles of the same size and is read-only.
 
     ravg : numpy array
         Average radius in pixels used in constructing profile.
@@ -203,26 +232,21 @@ def radial_profile(data, center, size=30, return_scaled=True):
     radialprofile : numpy array
         Radial profile.
     """
-    yd, xd = np.indices((size, size))
-
-    sub_image = Cutout2D(data, center, size, mode="strict")
-    sub_center = sub_image.center_cutout
-
-    r = np.sqrt((xd - sub_center[0]) ** 2 + (yd - sub_center[1]) ** 2)
-    r_exact = r.copy()
-    r = r.astype(int)
+    # This is the cutout Cutout2D(data, center, size, mode="strict") would
+    # make, without the overhead of building the Cutout2D object.
+    data = np.asanyarray(data)
+    slices, _ = overlap_slices(data.shape, (size, size), center[::-1], mode="strict")
+    sub_data = data[slices]
 
-    sub_data = sub_image.data
+    r_exact, r, rbin, nr = _radial_grid(size)
 
-    tbin = np.bincount(r.ravel(), sub_data.ravel())
-    rbin = np.bincount(r.ravel(), r_exact.ravel())
-    nr = np.bincount(r.ravel())
+    tbin = np.bincount(r, sub_data.ravel())
     if return_scaled:
         radialprofile = tbin / nr
         ravg = rbin / nr
     else:
         radialprofile = tbin
-        ravg = rbin
+        ravg = rbin.copy()
 
     return r_exact, ravg, radialprofile
 
@@ -293,7 +317,10 @@ class RadialProfile:
             self.data, self.cen, size=profile_size
         )
 
-        self.sub_data = Cutout2D(self.data, self.cen, size=profile_size).data
+        slices, _ = overlap_slices(
+            self.data.shape, (profile_size, profile_size), self.cen[::-1], mode="trim"
+        )
+        self.sub_data = self.data[slices]
         sub_med = np.median(self.sub_data)
         adjust_max = self.radialprofile.max() - sub_med
         self.scaled_profile = (self.radialprofile - sub_med) / adjust_max
@@ -352,7 +379,12 @@ class RadialProfile:
         # so that we just need to find the first place where intensity is
         # less than 0.5 to estimate the HWHM.
         less_than_half = intensity < 0.5
-        half_index = np.arange(len(less_than_half))[less_than_half][0]
+        half_index = np.argmax(less_than_half)
+        if not less_than_half[half_index]:
+            raise ValueError("Intensity never drops below half the maximum.")
+        if half_index == 0:
+            # Nothing inside the first bin to interpolate from
+            return r[0]
         before_half = half_index - 1
 
         # Do linear interpolation to find the radius at which the intensity
@@ -393,6 +425,10 @@ class SeeingProfileWidget:
     A class for storing an instance of a widget displaying the seeing profile
     of stars in an image.
 
+    The net counts and SNR plots are redrawn on the same figures and displayed
+    again after each click, which requires the inline matplotlib backend
+    (``%matplotlib inline``).
+
     Parameters
     ----------
     imagewidget : `astrowidgets.ImageWidget`, optional
@@ -467,6 +503,11 @@ class SeeingProfileWidget:
         self.out = ipw.Output()
         self.out2 = ipw.Output()
         self.out3 = ipw.Output()
+        # The net counts and SNR figures are redrawn in place on each click
+        self._counts_fig = Figure(figsize=(10, 5))
+        self._counts_ax = self._counts_fig.add_subplot()
+        self._snr_fig = Figure(figsize=(10, 5))
+        self._snr_ax = self._snr_fig.add_subplot()
         # Build the larger widget
         self.container = ipw.VBox()
         self.fits_file = FitsOpener(title="Choose an image")
@@ -704,9 +745,9 @@ class SeeingProfileWidget:
     def _update_plots(self):
         # DISPLAY THE SCALED PROFILE
         fig_size = (10, 5)
-        profile_size = 60
 
         rad_prof = self.rad_prof
+        profile_size = rad_prof.profile_size
         self.out.clear_output(wait=True)
         ap_settings = ApertureSettings(**self.aperture_settings.value)
         with self.out:
@@ -726,40 +767,38 @@ class SeeingProfileWidget:
         # CALCULATE AND DISPLAY NET COUNTS INSIDE RADIUS
         self.out2.clear_output(wait=True)
         with self.out2:
-            sub_blot = rad_prof.sub_data.copy().astype("float32")
+            # Sky statistics from the finite pixels outside a box around the star
+            sky_mask = np.isfinite(rad_prof.sub_data)
             min_idx = profile_size // 2 - 2 * rad_prof.FWHM
             max_idx = profile_size // 2 + 2 * rad_prof.FWHM
-            sub_blot[min_idx:max_idx, min_idx:max_idx] = np.nan
-            sub_std = np.nanstd(sub_blot)
-            new_sub_med = np.nanmedian(sub_blot)
-            r_exact, ravg, tbin2 = radial_profile(
-                rad_prof.data - new_sub_med,
+            sky_mask[min_idx:max_idx, min_idx:max_idx] = False
+            sky = rad_prof.sub_data[sky_mask]
+            sub_std = np.std(sky)
+            new_sub_med = np.median(sky)
+            # Subtract the background from the summed counts at each radius
+            # rather than from the whole image.
+            _, _, tbin = radial_profile(
+                rad_prof.data,
                 rad_prof.cen,
                 size=profile_size,
                 return_scaled=False,
             )
-            r_exact_s, ravg_s, tbin2_s = radial_profile(
-                rad_prof.data - new_sub_med,
-                rad_prof.cen,
-                size=profile_size,
-                return_scaled=True,
-            )
-            # tbin2 = np.bincount(r.ravel(), (sub_data - sub_med).ravel())
+            _, _, _, nr = _radial_grid(profile_size)
+            tbin2 = tbin - new_sub_med * nr
             counts = np.cumsum(tbin2)
-            plt.figure(figsize=fig_size)
-            plt.plot(rad_prof.radius_values, counts)
-            plt.xlim(0, 40)
-            ylim = plt.ylim()
-            plt.vlines(ap_settings.radius, *plt.ylim(), colors=["red"])
-            plt.ylim(*ylim)
-            plt.grid()
-
-            plt.title("Net counts in aperture")
+            ax = self._counts_ax
+            ax.clear()
+            ax.plot(rad_prof.radius_values, counts)
+            ax.set_xlim(0, 40)
+            ax.axvline(ap_settings.radius, color="red")
+            ax.grid()
+
+            ax.set_title("Net counts in aperture")
             e_sky = np.nanmax([np.sqrt(new_sub_med), sub_std])
 
-            plt.xlabel("Aperture radius (pixels)")
-            plt.ylabel("Net counts")
-            plt.show()
+            ax.set_xlabel("Aperture radius (pixels)")
+            ax.set_ylabel("Net counts")
+            display(self._counts_fig)
 
         # CALCULATE And DISPLAY SNR AS A FUNCTION OF RADIUS
         self.out3.clear_output(wait=True)
@@ -767,31 +806,25 @@ class SeeingProfileWidget:
             read_noise = 10  # electrons
             gain = 1.5  # electrons/count
             # Poisson error is square root of the net number of counts enclosed
-            poisson = np.sqrt(np.cumsum(tbin2))
-
-            # This is obscure, but correctly calculated the number of pixels at
-            # each radius, since the smoothed is tbin2 divided by the number of
-            # pixels.
-            nr = tbin2 / tbin2_s
+            poisson = np.sqrt(counts)
 
             # This ignores dark current
             error = np.sqrt(
                 poisson**2 + np.cumsum(nr) * (e_sky**2 + (read_noise / gain) ** 2)
             )
 
-            snr = np.cumsum(tbin2) / error
-            plt.figure(figsize=fig_size)
-            plt.plot(rad_prof.radius_values + 1, snr)
+            snr = counts / error
+            ax = self._snr_ax
+            ax.clear()
+            ax.plot(rad_prof.radius_values + 1, snr)
 
-            plt.title(
+            ax.set_title(
                 f"Signal to noise ratio max {snr.max():.1f} "
                 f"at radius {snr.argmax() + 1}"
             )
-            plt.xlim(0, 40)
-            ylim = plt.ylim()
-            plt.vlines(ap_settings.radius, *plt.ylim(), colors=["red"])
-            plt.ylim(*ylim)
-            plt.xlabel("Aperture radius (pixels)")
-            plt.ylabel("SNR")
-            plt.grid()
-            plt.show()
+            ax.set_xlim(0, 40)
+            ax.axvline(ap_settings.radius, color="red")
+            ax.set_xlabel("Aperture radius (pixels)")
+            ax.set_ylabel("SNR")
+            ax.grid()
+            display(self._snr_fig)
@@ -0,0 +1,297 @@
+import numpy as np
+
+import ipywidgets as ipw
+from astropy import units as u
+from astropy.coordinates import SkyCoord
+from astropy.nddata import CCDData
+from astropy.table import Table
+from astropy.wcs import WCS
+from astrowidgets import ImageWidget
+
+from stellarphot.gui_tools import comparison_functions as cf
+
+SHAPE = (200, 200)
+RANDOM_SEED = 1230971
+
+
+class FakeEvent:
+    def __init__(self, x, y):
+        self.data_x = x
+        self.data_y = y
+
+
+def make_widget():
+    wcs = WCS(naxis=2)
+    wcs.wcs.ctype = ["RA---TAN", "DEC--TAN"]
+    wcs.wcs.crval = [150, 30]
+    wcs.wcs.crpix = [100, 100]
+    wcs.wcs.cdelt = [-1 / 3600, 1 / 3600]
+    ccd = CCDData(np.zeros(SHAPE), unit="adu", wcs=wcs)
+
+    iw = ImageWidget()
+    iw.load_nddata(ccd)
+
+    rng = np.random.default_rng(RANDOM_SEED)
+    xy = rng.uniform(10, 190, size=(20, 2))
+    coords = wcs.pixel_to_world(xy[:, 0], xy[:, 1])
+    iw.add_markers(
+        Table(dict(coords=coords)),
+        skycoord_colname="coords",
+        use_skycoord=True,
+        marker_name="APASS comparison",
+    )
+    return iw, xy
+
+
+def marker_names(iw):
+    return set(iw.get_markers(marker_name="all")["marker name"])
+
+
+def test_wrap_click_toggles_elim():
+    iw, xy = make_widget()
+    cb = cf.wrap(iw, ipw.Output())
+
+    # Click a couple of pixels (i.e. arcseconds) away from a star
+    x, y = xy[3] + 2
+    cb(None, FakeEvent(x, y), x, y)
+    assert marker_names(iw) == {"APASS comparison", "elim1"}
+    assert len(iw.get_markers(marker_name="elim1")) == 1
+
+    # A second click on a different star adds another elim...
+    x, y = xy[7]
+    cb(None, FakeEvent(x, y), x, y)
+    assert marker_names(iw) == {"APASS comparison", "elim1", "elim2"}
+
+    # ...and clicking the first star again removes its elim
+    x, y = xy[3]
+    cb(None, FakeEvent(x, y), x, y)
+    assert marker_names(iw) == {"APASS comparison", "elim2"}
+
+
+def test_wrap_click_far_from_star():
+    iw, _ = make_widget()
+    cb = cf.wrap(iw, ipw.Output())
+
+    # Stars are at least 10 pixels (arcseconds) from the corner
+    x, y = 0, 0
+    cb(None, FakeEvent(x, y), x, y)
+    assert marker_names(iw) == {"APASS comparison"}
+
+
+def test_resolve_name_is_cached(monkeypatch):
+    calls = []
+
+    def fake_from_name(name):
+        calls.append(name)
+        return SkyCoord(ra=150 * u.deg, dec=30 * u.deg)
+
+    monkeypatch.setattr(cf.SkyCoord, "from_name", fake_from_name)
+    cf._resolve_name.cache_clear()
+
+    first = cf._resolve_name("not a real star")
+    second = cf._resolve_name("not a real star")
+    assert first is second
+    assert calls == ["not a real star"]
+    cf._resolve_name.cache_clear()
+
+
+def test_wrap_ignores_repeated_click(monkeypatch):
+    # Use a fake clock so that how long handling a click takes does not matter
+    now = [100.0]
+    monkeypatch.setattr(cf.time, "monotonic", lambda: now[0])
+    iw, xy = make_widget()
+    cb = cf.wrap(iw, ipw.Output())
+
+    # Two clicks in quick succession at the same spot count only once,
+    # so the star stays excluded instead of being toggled back.
+    x, y = xy[3]
+    cb(None, FakeEvent(x, y), x, y)
+    now[0] += 0.01
+    cb(None, FakeEvent(x, y), x, y)
+    assert marker_names(iw) == {"APASS comparison", "elim1"}
+
+    # A click at the same spot after the wait is handled, toggling the star back
+    now[0] += 1
+    cb(None, FakeEvent(x, y), x, y)
+    assert marker_names(iw) == {"APASS comparison"}
+
+
+def test_generate_table_sort_order():
+    iw, xy = make_widget()
+    coords = iw.get_markers(marker_name="APASS comparison")["coord"]
+    for name, rows in [("VSX", slice(0, 4)), ("TESS Targets", slice(10, 11))]:
+        iw.add_markers(
+            Table(dict(coords=coords[rows])),
+            skycoord_colname="coords",
+            use_skycoord=True,
+            marker_name=name,
+        )
+
+    # Exclude one of the APASS stars
+    cb = cf.wrap(iw, ipw.Output())
+    x, y = xy[15]
+    cb(None, FakeEvent(x, y), x, y)
+
+    cv = cf.ComparisonViewer()
+    cv.iw = iw
+    cv.target_coord = coords[12]
+    comp_table = cv.generate_table()
+
+    # 20 APASS, 4 VSX and 1 TESS marker, less the excluded star
+    assert len(comp_table) == 24
+    # The target comes first, followed by the TESS target, then the variables
+    assert comp_table["separation"][0] == 0
+    assert comp_table["marker name"][1] == "TESS Targets"
+    assert all(comp_table["marker name"][2:6] == "VSX")
+    assert all(comp_table["marker name"][6:] == "APASS comparison")
+    # Within each group stars are ordered by distance from the target
+    assert all(np.diff(comp_table["separation"][6:]) >= 0)
+    np.testing.assert_array_equal(comp_table["star_id"], np.arange(1, 25))
+
+
+def test_generate_table_excludes_all_markers_under_elim():
+    iw, xy = make_widget()
+    coords = iw.get_markers(marker_name="APASS comparison")["coord"]
+    # A variable at the same position as one of the APASS stars
+    iw.add_markers(
+        Table(dict(coords=coords[:1])),
+        skycoord_colname="coords",
+        use_skycoord=True,
+        marker_name="VSX",
+    )
+
+    cb = cf.wrap(iw, ipw.Output())
+    x, y = xy[0]
+    cb(None, FakeEvent(x, y), x, y)
+    assert len(iw.get_markers(marker_name="elim1")) == 2
+
+    cv = cf.ComparisonViewer()
+    cv.iw = iw
+    cv.target_coord = coords[5]
+    comp_table = cv.generate_table()
+
+    # Both markers at the excluded position are gone
+    assert len(comp_table) == 19
+    assert "VSX" not in comp_table["marker name"]
+
+
+def test_show_labels():
+    iw, _ = make_widget()
+    coords = iw.get_markers(marker_name="APASS comparison")["coord"]
+    iw.add_markers(
+        Table(dict(coords=coords[:2])),
+        skycoord_colname="coords",
+        use_skycoord=True,
+        marker_name="VSX",
+    )
+    original_marker = iw._marker
+
+    cv = cf.ComparisonViewer()
+    cv.iw = iw
+    cv.target_coord = coords[5]
+    comp_table = cv.generate_table()
+    cv.show_labels()
+
+    labels = iw._viewer.canvas.get_object_by_tag(cv._label_name).objects
+    assert len(labels) == len(comp_table)
+    assert [label.text[0] for label in labels] == ["C"] + ["V"] * 2 + ["C"] * 19
+    assert [label.text[1:] for label in labels] == [
+        str(star_id) for star_id in comp_table["star_id"]
+    ]
+    np.testing.assert_allclose([label.x for label in labels], comp_table["x"] + 20)
+    assert iw._marker is original_marker
+
+
+def test_all_markers_snapshot_is_cached():
+    iw, _ = make_widget()
+    first = cf._all_markers(iw)
+    assert cf._all_markers(iw) is first
+
+    # Adding markers invalidates the snapshot...
+    iw.add_markers(
+        Table(dict(coords=first["coord"][:2])),
+        skycoord_colname="coords",
+        use_skycoord=True,
+        marker_name="VSX",
+    )
+    second = cf._all_markers(iw)
+    assert second is not first
+    assert len(second) == len(first) + 2
+
+    # ...and so does removing them
+    iw.remove_markers(marker_name="VSX")
+    third = cf._all_markers(iw)
+    assert third is not second
+    assert len(third) == len(first)
+
+
+def test_variables():
+    iw, _ = make_widget()
+    coords = iw.get_markers(marker_name="APASS comparison")["coord"]
+    # Known variables, in a different order than the star ids will be
+    vsx = Table(dict(Name=["V3", "V1", "V2"], coords=coords[[9, 2, 4]]))
+    iw.add_markers(vsx, skycoord_colname="coords", use_skycoord=True, marker_name="VSX")
+
+    cv = cf.ComparisonViewer()
+    cv.iw = iw
+    cv.target_coord = coords[5]
+    cv.vsx = vsx
+    cv._vsx_kdt = cf._coord_tree(vsx["coords"])
+
+    comp_table = cv.generate_table()
+    our_vsx = cv.variables
+    vsx_rows = comp_table[comp_table["marker name"] == "VSX"]
+    np.testing.assert_array_equal(our_vsx["star_id"], vsx_rows["star_id"])
+    # Each variable is matched back to its own entry in the VSX table
+    assert all(our_vsx["coords"].separation(vsx_rows["coord"]).arcsec < 0.01)
+    assert sorted(our_vsx["Name"]) == ["V1", "V2", "V3"]
+
+
+def test_wrap_click_removes_elim_covering_two_markers():
+    iw, xy = make_widget()
+    coords = iw.get_markers(marker_name="APASS comparison")["coord"]
+    iw.add_markers(
+        Table(dict(coords=coords[:1])),
+        skycoord_colname="coords",
+        use_skycoord=True,
+        marker_name="VSX",
+    )
+    cb = cf.wrap(iw, ipw.Output())
+
+    # Exclude the star with two markers, then include it again
+    x, y = xy[0]
+    cb(None, FakeEvent(x, y), x, y)
+    assert len(iw.get_markers(marker_name="elim1")) == 2
+    x, y = xy[0] + 1
+    cb(None, FakeEvent(x, y), x, y)
+    assert marker_names(iw) == {"APASS comparison", "VSX"}
+
+
+def test_show_labels_reuses_labels(monkeypatch):
+    iw, _ = make_widget()
+    coords = iw.get_markers(marker_name="APASS comparison")["coord"]
+
+    cv = cf.ComparisonViewer()
+    cv.iw = iw
+    cv.target_coord = coords[5]
+
+    cv.show_labels()
+    first = iw._viewer.canvas.get_object_by_tag(cv._label_name).objects
+    cv.remove_labels()
+
+    # Hiding and showing the labels again does not regenerate the table...
+    def fail():
+        raise AssertionError("generate_table should not have been called")
+
+    monkeypatch.setattr(cv, "generate_table", fail)
+    cv.show_labels()
+    second = iw._viewer.canvas.get_object_by_tag(cv._label_name).objects
+    assert [label.text for label in second] == [label.text for label in first]
+    cv.remove_labels()
+
+    # ...unless the target changes
+    monkeypatch.undo()
+    cv.target_coord = coords[6]
+    cv.show_labels()
+    third = iw._viewer.canvas.get_object_by_tag(cv._label_name).objects
+    assert len(third) == len(first)
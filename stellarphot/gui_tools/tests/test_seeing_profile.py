@@ -3,6 +3,7 @@ import numpy as np
 import pytest
 
 from photutils.datasets import make_gaussian_sources_image, make_noise_image
+from astropy.stats import sigma_clipped_stats
 from astropy.table import Table
 from astrowidgets import ImageWidget
 
@@ -89,6 +90,25 @@ def test_find_center_no_noise_star_at_edge():
     np.testing.assert_allclose(cen, [30, 40])
 
 
+def test_find_center_stops_when_cutout_does_not_move(monkeypatch):
+    image = make_gaussian_sources_image(SHAPE, STARS)
+    noise = make_noise_image(
+        SHAPE, distribution="gaussian", mean=0, stddev=5, seed=RANDOM_SEED
+    )
+    calls = []
+
+    def counting_stats(data):
+        calls.append(data)
+        return sigma_clipped_stats(data)
+
+    monkeypatch.setattr(spf, "sigma_clipped_stats", counting_stats)
+    cen = spf.find_center(image + noise, [33, 44], max_iters=10)
+    np.testing.assert_allclose(cen, [30, 40], atol=0.02)
+    # One estimate of the sky at the guess and one after re-centering; the
+    # re-centered cutout does not move, so there is no need for a third.
+    assert len(calls) == 2
+
+
 def test_find_center_no_star():
     # No star anywhere near the original guess
     image = make_gaussian_sources_image(SHAPE, STARS)
@@ -112,3 +132,80 @@ def test_radial_profile():
         expected_integral = 2 * np.pi * row["amplitude"] * row["x_stddev"] ** 2
         print(expected_integral, radprofs.sum())
         np.testing.assert_allclose(radprofs.sum(), expected_integral, atol=50)
+
+
+def test_radial_profile_shares_radius_grid():
+    image = make_gaussian_sources_image(SHAPE, STARS)
+    r_ex, _, _ = spf.radial_profile(image, (30, 40))
+    r_ex2, _, _ = spf.radial_profile(image, (100, 110))
+    # Profiles of the same size share one read-only grid of radii...
+    assert r_ex is r_ex2
+    assert not r_ex.flags.writeable
+    # ...measured from the middle of the cutout
+    assert r_ex[14, 14] == r_ex[15, 15] == np.sqrt(0.5)
+
+
+def test_find_hwhm():
+    image = make_gaussian_sources_image(SHAPE, STARS)
+    rad_prof = spf.RadialProfile(image, 30, 40)
+    rad_prof.profile(60)
+    # For a Gaussian the HWHM is sqrt(2 ln 2) times the standard deviation
+    expected = np.sqrt(2 * np.log(2)) * STARS["x_stddev"][0]
+    np.testing.assert_allclose(rad_prof.HWHM, expected, rtol=0.05)
+
+
+def test_find_hwhm_never_below_half():
+    image = make_gaussian_sources_image(SHAPE, STARS)
+    rad_prof = spf.RadialProfile(image, 30, 40)
+    rad_prof.profile(60)
+    rad_prof.scaled_profile = np.ones_like(rad_prof.scaled_profile)
+    with pytest.raises(ValueError, match="never drops below half"):
+        rad_prof.find_hwhm()
+
+
+# The installed ipyautoui passes a style argument that some ipywidgets versions
+# do not recognize when the widget is built.
+@pytest.mark.filterwarnings(
+    "ignore:Passing unrecognized arguments to super:DeprecationWarning"
+)
+def test_update_plots_counts_and_snr():
+    image = make_gaussian_sources_image(SHAPE, STARS) + make_noise_image(
+        SHAPE, distribution="gaussian", mean=100, stddev=5, seed=RANDOM_SEED
+    )
+    spw = spf.SeeingProfileWidget()
+    rad_prof = spf.RadialProfile(image, 30, 40)
+    rad_prof.profile(60)
+    spw.rad_prof = rad_prof
+    spw._update_plots()
+
+    # Calculate the expected net counts and SNR directly, subtracting the
+    # sky from the whole image.
+    sub_blot = rad_prof.sub_data.copy()
+    min_idx = 30 - 2 * rad_prof.FWHM
+    max_idx = 30 + 2 * rad_prof.FWHM
+    sub_blot[min_idx:max_idx, min_idx:max_idx] = np.nan
+    sky_med = np.nanmedian(sub_blot)
+    sky_std = np.nanstd(sub_blot)
+    _, _, tbin = spf.radial_profile(image - sky_med, rad_prof.cen, size=60)
+    _, _, tbin_unscaled = spf.radial_profile(
+        image - sky_med, rad_prof.cen, size=60, return_scaled=False
+    )
+    n_pixels = tbin_unscaled / tbin
+    counts = np.cumsum(tbin_unscaled)
+    e_sky = max(np.sqrt(sky_med), sky_std)
+    # Read noise of 10 electrons and gain of 1.5, as in the widget
+    error = np.sqrt(counts + np.cumsum(n_pixels) * (e_sky**2 + (10 / 1.5) ** 2))
+
+    counts_line = spw._counts_ax.lines[0]
+    np.testing.assert_allclose(counts_line.get_xdata(), rad_prof.radius_values)
+    np.testing.assert_allclose(counts_line.get_ydata(), counts)
+    snr_line = spw._snr_ax.lines[0]
+    np.testing.assert_allclose(snr_line.get_xdata(), rad_prof.radius_values + 1)
+    np.testing.assert_allclose(snr_line.get_ydata(), counts / error)
+
+    # Updating again redraws the same figures rather than adding to them
+    counts_fig = spw._counts_fig
+    spw._update_plots()
+    assert spw._counts_fig is counts_fig
+    assert len(spw._counts_ax.lines) == 2
+    assert len(spw._snr_ax.lines) == 2
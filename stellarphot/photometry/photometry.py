@@ -16,7 +16,7 @@ from ccdproc import ImageFileCollection
 from photutils.aperture import CircularAnnulus, CircularAperture, aperture_photometry
 from photutils.centroids import centroid_sources
 
-from scipy.spatial.distance import cdist
+from scipy.spatial import cKDTree
 
 from stellarphot import Camera, PhotometryData, SourceListData
 
@@ -539,29 +539,33 @@ def single_image_photometry(
         "or bad aperture net counts had aperture_net_cnts set to NaN."
     )
 
+    # Grab the plain arrays once; the magnitude, noise and SNR calculations
+    # below are all done on these rather than on the table columns.
+    gain = camera.gain.value
+    net_cnts = photom["aperture_net_cnts"].value
+    exposures = photom["exposure"].value
+
     # Compute instrumental magnitudes
-    photom["mag_inst"] = -2.5 * np.log10(
-        camera.gain.value * photom["aperture_net_cnts"].value / photom["exposure"].value
-    )
+    photom["mag_inst"] = -2.5 * np.log10(gain * net_cnts / exposures)
 
     # Compute and save noise
     msg = f"{logline} Calculating noise for all sources ... "
     noise = calculate_noise(
         camera=camera,
-        counts=photom["aperture_net_cnts"].value,
+        counts=net_cnts,
         sky_per_pix=photom["sky_per_pix_avg"].value,
         aperture_area=photom["aperture_area"].value,
         annulus_area=photom["annulus_area"].value,
-        exposure=photom["exposure"].value,
+        exposure=exposures,
         include_digitization=include_dig_noise,
     )
     photom["noise_electrons"] = noise  # Noise in electrons
     photom["noise_electrons"].unit = u.electron
-    photom["noise_cnts"] = noise / camera.gain.value  # Noise in counts
+    photom["noise_cnts"] = noise / gain  # Noise in counts
     photom["noise_cnts"].unit = ccd_image.unit
 
     # Compute and save SNR
-    snr = camera.gain.value * photom["aperture_net_cnts"] / noise
+    snr = gain * net_cnts / noise
     photom["snr"] = snr
     photom["mag_error"] = 1.085736205 / snr
     msg += "DONE."
@@ -951,12 +955,10 @@ def find_too_close(sourcelist, aperture_rad, pixel_scale=None):
 
     if sourcelist.has_x_y:
         x, y = sourcelist["xcenter"], sourcelist["ycenter"]
-        # Find the pixel distance to the nearest neighbor for each source
-        dist_mat = cdist(np.array([x, y]).T, np.array([x, y]).T, metric="euclidean")
-        np.fill_diagonal(dist_mat, np.inf)
+        xy = np.array([x, y]).T
         # Return array with True where the distance is less than twice the aperture
         # radius
-        return dist_mat.min(0) < 2 * aperture_rad
+        return _nearest_closer_than(xy, 2 * aperture_rad)
     elif sourcelist.has_ra_dec:
         if pixel_scale is None:
             raise ValueError(
@@ -966,12 +968,30 @@ def find_too_close(sourcelist, aperture_rad, pixel_scale=None):
         star_coords = SkyCoord(
             ra=sourcelist["ra"], dec=sourcelist["dec"], frame="icrs", unit="degree"
         )
-        idxc, d2d, d3d = star_coords.match_to_catalog_sky(star_coords, nthneighbor=2)
-        return d2d < (aperture_rad * 2 * pixel_scale * u.arcsec)
+        # Same as above, on unit vectors, where the distance between two
+        # points separated by an angle theta is 2 * sin(theta / 2).
+        xyz = star_coords.cartesian.xyz.value.T
+        max_sep = (aperture_rad * 2 * pixel_scale * u.arcsec).to_value(u.rad)
+        return _nearest_closer_than(xyz, 2 * np.sin(max_sep / 2))
     else:
         raise ValueError("sourcelist must have x/y or ra/dec coordinates")
 
 
+def _nearest_closer_than(points, max_dist):
+    # Return True for each point whose nearest neighbor is closer than
+    # max_dist. The closest point to each point is itself, so ask only for the
+    # second closest rather than building the full distance matrix. Points
+    # with non-finite coordinates are never too close, as with the distance
+    # matrix, and are left out of the tree since it requires finite data.
+    finite = np.isfinite(points).all(axis=1)
+    too_close = np.zeros(len(points), dtype=bool)
+    if finite.sum() > 1:
+        good_points = points[finite]
+        dist, _ = cKDTree(good_points).query(good_points, k=[2])
+        too_close[finite] = dist[:, 0] < max_dist
+    return too_close
+
+
 def clipped_sky_per_pix_stats(data, annulus, sigma=5, iters=5):
     """
     Calculate sigma-clipped statistics on an annulus.
@@ -1120,13 +1140,18 @@ def calculate_noise(
     except AttributeError:
         pass
 
-    sky = area_ratio * gain * sky_per_pix
-    dark = area_ratio * dark_current_per_sec * exposure
-    rn_error = area_ratio * read_noise**2
+    # The sky, dark, read noise and digitization terms are all per pixel and
+    # scale with the same area ratio, so sum them first and multiply by the
+    # area ratio only once.
+    sky = gain * sky_per_pix
+    dark = dark_current_per_sec * exposure
+    rn_error = read_noise**2
 
     digitization = 0.0
 
     if include_digitization:
-        digitization = area_ratio * (gain * 0.289) ** 2
+        digitization = (gain * 0.289) ** 2
+
+    per_pixel = sky + dark + rn_error + digitization
 
-    return np.sqrt(poisson_source + sky + dark + rn_error + digitization)
+    return np.sqrt(poisson_source + area_ratio * per_pixel)
@@ -7,6 +7,7 @@ import pytest
 from astropy import units as u
 from astropy.coordinates import EarthLocation
 from astropy.io import ascii
+from astropy.table import Table
 from astropy.utils.data import get_pkg_data_filename
 from astropy.utils.metadata.exceptions import MergeConflictWarning
 
@@ -260,6 +261,34 @@ def test_find_too_close():
     assert np.sum(rejects) == 5
 
 
+def test_find_too_close_nan_positions():
+    # Sources with a missing position are never too close to another source
+    # and do not prevent checking the others.
+    xy_data = Table(
+        dict(
+            star_id=[1, 2, 3, 4],
+            xcenter=[10, 12, np.nan, 100] * u.pix,
+            ycenter=[10, 10, 10, 10] * u.pix,
+        )
+    )
+    sl_xy = SourceListData(input_data=xy_data, colname_map=None)
+    rejects = find_too_close(sl_xy, 0.5, pixel_scale=0.5)
+    np.testing.assert_array_equal(rejects, [False, False, False, False])
+    rejects = find_too_close(sl_xy, 2.0, pixel_scale=0.5)
+    np.testing.assert_array_equal(rejects, [True, True, False, False])
+
+    radec_data = Table(
+        dict(
+            star_id=[1, 2, 3, 4],
+            ra=[10, 10 + 1 / 3600, np.nan, 11] * u.deg,
+            dec=[10, 10, 10, 10] * u.deg,
+        )
+    )
+    sl_radec = SourceListData(input_data=radec_data, colname_map=None)
+    rejects = find_too_close(sl_radec, 2.0, pixel_scale=1.0)
+    np.testing.assert_array_equal(rejects, [True, True, False, False])
+
+
 # The True case below is a regression test for #157
 @pytest.mark.parametrize("int_data", [True, False])
 def test_aperture_photometry_no_outlier_rejection(int_data):
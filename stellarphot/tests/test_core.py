@@ -3,7 +3,7 @@ import warnings
 import pytest
 import numpy as np
 from astropy import units as u
-from astropy.table import Table, Column
+from astropy.table import Table, Column, MaskedColumn, vstack
 from astropy.time import Time
 from astropy.io import ascii, fits
 from astropy.coordinates import EarthLocation, SkyCoord
@@ -274,6 +274,19 @@ def test_base_enhanced_table_from_existing_table():
     assert len(test_base2["dec"]) == 1
 
 
+def test_base_enhanced_table_does_not_share_input():
+    # Changes to the new table should not modify the input table
+    input_data = testdata.copy()
+    input_data.meta["nested"] = {"a": 1}
+    test_base = BaseEnhancedTable(
+        table_description=test_descript, input_data=input_data
+    )
+    test_base["ra"][0] = 0 * u.deg
+    assert input_data["ra"][0] == testdata["ra"][0]
+    test_base.meta["nested"]["a"] = 2
+    assert input_data.meta["nested"]["a"] == 1
+
+
 def test_base_enhanced_table_clean():
     # Check that the clean method exists
     test_base = BaseEnhancedTable(table_description=test_descript, input_data=testdata)
@@ -384,6 +397,12 @@ def test_clean_criteria_none_removed():
     assert (out == inp).all()
 
 
+def test_base_enhanced_table_bad_description():
+    # Should raise exception because the table description is not dict-like
+    with pytest.raises(TypeError, match="You must provide a dict as table_description"):
+        BaseEnhancedTable(table_description=["ra", "dec"], input_data=testdata)
+
+
 def test_base_enhanced_table_missing_column():
     # Should raise exception because the RA data is missing from input data
     testdata_nora = testdata.copy()
@@ -639,6 +658,7 @@ def test_photometry_data():
     assert phot_data.camera.read_noise == 10.0 * u.electron
     assert phot_data.camera.dark_current == 0.01 * u.electron / u.second
     assert phot_data.camera.pixel_scale == 0.563 * u.arcsec / u.pix
+    assert phot_data.camera == feder_cg_16m
     np.testing.assert_almost_equal(phot_data.observatory.lat.value, 46.86678)
     assert phot_data.observatory.lat.unit == u.deg
     np.testing.assert_almost_equal(phot_data.observatory.lon.value, -96.45328)
@@ -659,6 +679,96 @@ def test_photometry_data():
     assert (phot_data["bjd"][0].value - 2459910.775405664) * 86400 < 0.05
 
 
+def test_photometry_night():
+    # Observations from the evening and the following morning are the same
+    # night, while an observation the next afternoon starts a new one.
+    several = vstack([testphot_clean] * 3)
+    several["date-obs"] = Time(
+        ["2022-11-27T02:00:00", "2022-11-27T06:26:29.62", "2022-11-27T20:00:00"],
+        scale="utc",
+    )
+    phot_data = PhotometryData(
+        observatory=feder_obs,
+        camera=feder_cg_16m,
+        passband_map=feder_passbands,
+        input_data=several,
+    )
+    assert list(phot_data["night"]) == [59909, 59909, 59910]
+
+
+def test_photometry_bjd_several_times():
+    # The BJD calculation reuses the ephemeris for rows with the same time, so
+    # check it against astropy for a table with repeated and distinct times.
+    several = vstack([testphot_clean] * 6)
+    several["date-obs"] = Time(several["date-obs"]) + [0, 0, 1, 1, 1, 2] * u.hr
+    several["ra"] = [78.17, 10.0, 78.17, 200.0, 300.0, 45.0] * u.deg
+    several["dec"] = [22.5, -60.0, 22.5, 5.0, 80.0, -10.0] * u.deg
+    phot_data = PhotometryData(
+        observatory=feder_obs,
+        camera=feder_cg_16m,
+        passband_map=feder_passbands,
+        input_data=several,
+    )
+
+    times = Time(several["date-obs"])
+    coords = SkyCoord(ra=several["ra"], dec=several["dec"])
+    expected = (
+        times.tdb
+        + times.light_travel_time(coords, location=feder_obs)
+        + several["exposure"] / 2
+    )
+    np.testing.assert_allclose(
+        (phot_data["bjd"] - expected).to_value(u.s), 0, atol=1e-6
+    )
+
+
+def test_photometry_camera_validates_meta():
+    # The camera is rebuilt from meta, which users can change, so the values
+    # there must still be converted and validated.
+    phot_data = PhotometryData(
+        observatory=feder_obs,
+        camera=feder_cg_16m,
+        passband_map=feder_passbands,
+        input_data=testphot_clean,
+    )
+    phot_data.meta["data_unit"] = "adu"
+    phot_data.meta["gain"] = "1.5 electron / adu"
+    camera = phot_data.camera
+    assert isinstance(camera.data_unit, u.UnitBase)
+    assert camera.data_unit == u.adu
+    assert isinstance(camera.gain, u.Quantity)
+    assert camera.gain == 1.5 * u.electron / u.adu
+
+    phot_data.meta["gain"] = -3
+    with pytest.raises(ValidationError, match="Must provided a unit"):
+        phot_data.camera
+
+
+@pytest.mark.parametrize("change", ["sort", "remove_rows"])
+def test_photometry_bjd_after_changing_rows(change):
+    # add_bjd_col must use the current rows of the table, not the ones it had
+    # when it was created.
+    several = vstack([testphot_clean] * 4)
+    times = Time(several["date-obs"]) + [0, 1, 2, 3] * u.hr
+    # Keep 'date-obs' as a column of Time objects, like the test data
+    several["date-obs"] = Column(data=list(times), name="date-obs")
+    several["ra"] = [78.17, 10.0, 200.0, 300.0] * u.deg
+    phot_data = PhotometryData(
+        observatory=feder_obs,
+        camera=feder_cg_16m,
+        passband_map=feder_passbands,
+        input_data=several,
+    )
+
+    if change == "sort":
+        phot_data.sort("ra", reverse=True)
+    else:
+        phot_data.remove_rows([0])
+
+    bjd = phot_data.add_bjd_col(feder_obs)
+    np.testing.assert_allclose((bjd - phot_data["bjd"]).to_value(u.s), 0, atol=1e-6)
+
+
 def test_photometry_slicing():
     # Create photometry data instance
     phot_data = PhotometryData(
@@ -711,6 +821,31 @@ def test_photometry_badtime():
         )
 
 
+def test_photometry_time_column():
+    # A Time column (rather than a column of Time entries) should also work
+    time_col_data = testphot_clean.copy()
+    time_col_data["date-obs"] = Time(time_col_data["date-obs"])
+    phot_data = PhotometryData(
+        observatory=feder_obs,
+        camera=feder_cg_16m,
+        passband_map=feder_passbands,
+        input_data=time_col_data,
+    )
+    assert phot_data["night"][0] == 59909
+
+
+def test_photometry_badtime_scale():
+    tai_data = testphot_clean.copy()
+    tai_data["date-obs"] = Time(tai_data["date-obs"]).tai
+    with pytest.raises(ValueError, match="must have scale='utc', not 'tai'"):
+        phot_data = PhotometryData(
+            observatory=feder_obs,
+            camera=feder_cg_16m,
+            passband_map=feder_passbands,
+            input_data=tai_data,
+        )
+
+
 def test_photometry_inconsistent_count_units():
     with pytest.raises(ValueError):
         phot_data = PhotometryData(
@@ -804,6 +939,117 @@ def test_catalog_bandpassmap():
     assert catalog_dat.catalog_source == "Vizier"
 
 
+def test_catalog_bandpassmap_longer_names():
+    # New passband names longer than the original ones should not be truncated
+    vsx_colname_map = {
+        "Name": "id",
+        "RAJ2000": "ra",
+        "DEJ2000": "dec",
+        "max": "mag",
+        "n_max": "passband",
+    }
+    passband_map = {"g": "SDSS_g", "r": "SDSS_r"}
+    catalog_dat = CatalogData(
+        input_data=test_cat,
+        catalog_name="VSX",
+        catalog_source="Vizier",
+        colname_map=vsx_colname_map,
+        passband_map=passband_map,
+    )
+
+    assert catalog_dat["passband"][0] == "SDSS_g"
+    # Passbands not in the map are left alone
+    unmapped = set(test_cat["n_max"]) - set(passband_map)
+    assert unmapped <= set(catalog_dat["passband"])
+
+
+def test_catalog_bandpassmap_masked_passband():
+    # Masked passbands should stay masked after the passbands are updated
+    vsx_colname_map = {
+        "Name": "id",
+        "RAJ2000": "ra",
+        "DEJ2000": "dec",
+        "max": "mag",
+        "n_max": "passband",
+    }
+    masked_cat = Table(test_cat, masked=True)
+    masked_cat["n_max"].mask[1] = True
+    catalog_dat = CatalogData(
+        input_data=masked_cat,
+        catalog_name="VSX",
+        catalog_source="Vizier",
+        colname_map=vsx_colname_map,
+        passband_map={"g": "SG", "r": "SR"},
+    )
+
+    assert catalog_dat["passband"][0] == "SG"
+    assert catalog_dat["passband"].mask[1]
+    assert not catalog_dat["passband"].mask[0]
+
+
+def test_catalog_does_not_change_input():
+    # Renaming columns should not affect the input table, and changing the
+    # catalog data should not change the input data.
+    vsx_colname_map = {
+        "Name": "id",
+        "RAJ2000": "ra",
+        "DEJ2000": "dec",
+        "max": "mag",
+        "n_max": "passband",
+    }
+    input_cat = test_cat.copy()
+    input_cat.meta["nested"] = {"a": 1}
+    catalog_dat = CatalogData(
+        input_data=input_cat,
+        catalog_name="VSX",
+        catalog_source="Vizier",
+        colname_map=vsx_colname_map,
+    )
+    assert input_cat.colnames == test_cat.colnames
+    catalog_dat["mag"][0] = 0
+    assert input_cat["max"][0] == test_cat["max"][0]
+    catalog_dat.meta["nested"]["a"] = 2
+    assert input_cat.meta["nested"]["a"] == 1
+
+
+@pytest.mark.parametrize("mask", [[False, False, False], [False, True, False]])
+def test_catalog_bandpassmap_keeps_column_info(mask):
+    # Remapping passbands should keep the column's info, and its class and
+    # mask if it is a masked column.
+    vsx_colname_map = {
+        "Name": "id",
+        "RAJ2000": "ra",
+        "DEJ2000": "dec",
+        "max": "mag",
+        "n_max": "passband",
+    }
+    input_cat = test_cat[:3]
+    input_cat["n_max"] = MaskedColumn(
+        ["g", "r", "V"],
+        name="n_max",
+        description="band",
+        format="<8s",
+        meta={"source": "VSX"},
+        mask=mask,
+    )
+    catalog_dat = CatalogData(
+        input_data=input_cat,
+        catalog_name="VSX",
+        catalog_source="Vizier",
+        colname_map=vsx_colname_map,
+        passband_map={"g": "SDSS_g", "r": "SDSS_r"},
+    )
+
+    passband = catalog_dat["passband"]
+    assert isinstance(passband, MaskedColumn)
+    assert passband.info.description == "band"
+    assert passband.info.format == "<8s"
+    assert passband.info.meta == {"source": "VSX"}
+    np.testing.assert_array_equal(passband.mask, mask)
+    assert passband[0] == "SDSS_g"
+    assert passband[2] == "V"
+
+
 def test_catalog_recursive():
     # Construct good objects
     vsx_colname_map = {
@@ -1044,6 +1290,14 @@ def test_sourcelist():
     assert sl_test["star_id"][0] == 0
 
 
+def test_sourcelist_does_not_share_input_meta():
+    input_data = test_sl_data.copy()
+    input_data.meta["nested"] = {"a": 1}
+    sl_test = SourceListData(input_data=input_data, colname_map=None)
+    sl_test.meta["nested"]["a"] = 2
+    assert input_data.meta["nested"]["a"] == 1
+
+
 def test_sourcelist_no_skypos():
     test_sl_data2 = test_sl_data.copy()
     del test_sl_data2["ra"]